@@ -5,16 +5,20 @@ Places trades with configurable offset from signal time
 Trade timing is controlled by trade_config.txt file
 Example: Signal at 00:38:00, offset=3s → Execute at 00:37:57
 """
+import io
 import os
+import csv
 import json
 import time
 import asyncio
 import logging
-import pandas as pd
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple
 from dotenv import load_dotenv
 
+from async_runner import run_main
+
 # Import PocketOption API
 from pocketoptionapi_async import AsyncPocketOptionClient
 from pocketoptionapi_async.models import OrderDirection, OrderStatus
@@ -26,6 +30,30 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Signal direction -> API order direction (anything but 'call' trades as PUT)
+ORDER_DIRECTIONS = {'call': OrderDirection.CALL, 'put': OrderDirection.PUT}
+
+# Monitor CSV columns used when reading signals
+SIGNAL_CSV_COLUMNS = {'is_signal', 'asset', 'direction', 'signal_time', 'message_text'}
+
+@lru_cache(maxsize=2048)
+def parse_signal_time(signal_time_str: str) -> Tuple[int, int, int]:
+    """Split 'HH:MM:SS', 'HH:MM' or 'HH.MM' into (hour, minute, second)"""
+    # Signal times repeat across polls, so each string is only split once.
+    # Raises ValueError for anything else; ranges are checked by datetime.replace
+    parts = signal_time_str.split(':')
+    if len(parts) == 1:
+        parts = signal_time_str.split('.')
+        if len(parts) != 2:
+            raise ValueError(f"Unrecognised signal time: {signal_time_str}")
+    if len(parts) == 2:
+        (hour, minute), second = parts, 0
+    elif len(parts) == 3:
+        hour, minute, second = parts
+    else:
+        raise ValueError(f"Unrecognised signal time: {signal_time_str}")
+    return int(hour), int(minute), int(second)
+
 class MultiAssetMartingaleStrategy:
     """Multi-asset martingale strategy with immediate step progression"""
     
@@ -123,6 +151,15 @@ class MultiAssetMartingaleStrategy:
         current_amount = self.get_current_amount(asset)
         return f"{asset}: Step {strategy['step']}/3 (${current_amount})"
     
+    def get_max_sequence_loss(self, asset: str) -> float:
+        """Get the total stake lost if the asset loses every remaining step"""
+        amount = self.get_current_amount(asset)
+        total = 0.0
+        for _ in range(self.get_asset_step(asset), self.max_steps + 1):
+            total += amount
+            amount *= self.multiplier
+        return total
+    
     def get_all_active_assets(self) -> List[str]:
         """Get all assets currently being tracked"""
         return list(self.asset_strategies.keys())
@@ -191,6 +228,13 @@ class MultiAssetPreciseTrader:
         self.current_csv_date = None
         self._update_csv_filenames()
         
+        # Signal rows parsed so far from the active channel CSV and the byte
+        # offset reached, so polls only parse what the monitor appended since
+        self._signals_csv = None
+        self._signals_offset = 0
+        self._signals_header = None
+        self._signal_rows = []
+        
         # Channel selection and trade duration settings
         self.active_channel = None  # Will be set by user
         self.james_martin_duration = 60  # 60 seconds (1:00) for James Martin
@@ -278,8 +322,6 @@ class MultiAssetPreciseTrader:
     
     def _update_csv_filenames(self):
         """Automatically find and use the latest CSV files for each channel"""
-        import glob
-        
         today = datetime.now().strftime('%Y%m%d')
         
         # Check if we need to update (date changed or first run)
@@ -289,9 +331,20 @@ class MultiAssetPreciseTrader:
         old_date = self.current_csv_date
         self.current_csv_date = today
         
-        # Find James Martin CSV files
-        james_pattern = "pocketoption_james_martin_vip_channel_m1_*.csv"
-        james_files = glob.glob(james_pattern)
+        # Find James Martin and LC Trader CSV files in a single directory pass
+        james_prefix = "pocketoption_james_martin_vip_channel_m1_"
+        lc_prefix = "pocketoption_lc_trader_"
+        james_files = []
+        lc_files = []
+        with os.scandir('.') as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith('.csv'):
+                    continue
+                if name.startswith(james_prefix):
+                    james_files.append(name)
+                elif name.startswith(lc_prefix):
+                    lc_files.append(name)
         
         if james_files:
             # Sort by date (newest first) and use the latest
@@ -306,10 +359,6 @@ class MultiAssetPreciseTrader:
             # No files found, use today's date (will be created by monitor)
             self.james_martin_csv = f"pocketoption_james_martin_vip_channel_m1_{today}.csv"
         
-        # Find LC Trader CSV files
-        lc_pattern = "pocketoption_lc_trader_*.csv"
-        lc_files = glob.glob(lc_pattern)
-        
         if lc_files:
             # Sort by date (newest first) and use the latest
             lc_files.sort(reverse=True)
@@ -453,6 +502,58 @@ class MultiAssetPreciseTrader:
             self.client = None
             raise Exception(f"Connection error: {e}")
     
+    def _load_signal_rows(self, csv_file: str) -> List[Dict[str, Any]]:
+        """Return the signal rows of a channel CSV, parsing only rows appended since the last read"""
+        size = os.path.getsize(csv_file)
+        if csv_file != self._signals_csv or size < self._signals_offset:
+            # New day's file (or the file was rewritten): start from the top
+            self._signals_csv = csv_file
+            self._signals_offset = 0
+            self._signals_header = None
+            self._signal_rows = []
+        
+        if size == self._signals_offset:
+            return self._signal_rows
+        
+        with open(csv_file, 'rb') as f:
+            f.seek(self._signals_offset)
+            data = f.read()
+        
+        # Only consume complete lines; the monitor may be mid-way through a row.
+        # Rows never span lines because the monitor flattens line breaks
+        end = data.rfind(b'\n') + 1
+        if not end:
+            return self._signal_rows
+        # Decode before moving the offset so a failed decode doesn't drop the chunk
+        text = data[:end].decode('utf-8')
+        self._signals_offset += end
+        
+        # csv splits rows on \n only; str.splitlines() would also break a row on
+        # \x0b, \x1c, \u2028 and friends that can survive in message text
+        reader = csv.reader(io.StringIO(text, newline=''))
+        if self._signals_header is None:
+            self._signals_header = next(reader, None) or []
+        header = self._signals_header
+        has_signal_flag = 'is_signal' in header
+        
+        for values in reader:
+            if len(values) != len(header):
+                continue  # Malformed row
+            row = {column: value for column, value in zip(header, values) if column in SIGNAL_CSV_COLUMNS}
+            if has_signal_flag and row['is_signal'] != 'Yes':
+                continue
+            self._signal_rows.append(row)
+        
+        return self._signal_rows
+    
+    async def _sleep_until_next_second(self):
+        """Sleep until just past the next wall-clock second"""
+        # Signals fire on an exact HH:MM:SS match, so a fixed 1s sleep plus the
+        # loop's own work drifts and eventually skips a second (and its trade).
+        # The 10ms margin keeps an early timer wake-up from landing in the same
+        # second twice
+        await asyncio.sleep(1.01 - time.time() % 1)
+    
     def get_signals_from_csv(self) -> List[Dict[str, Any]]:
         """Get trading signals from selected channel CSV file"""
         try:
@@ -478,20 +579,27 @@ class MultiAssetPreciseTrader:
             
             print(f"📊 Reading signals from {channel_name} ({csv_file})")
             
-            df = pd.read_csv(csv_file, on_bad_lines='skip')
-            
-            if 'is_signal' in df.columns:
-                signals_df = df[df['is_signal'] == 'Yes'].copy()
-            else:
-                signals_df = df.copy()
+            signal_rows = self._load_signal_rows(csv_file)
             
-            if signals_df.empty:
+            if not signal_rows:
                 return []
             
             signals = []
             current_time = datetime.now()
             
-            for _, row in signals_df.iterrows():
+            # Everything below is the same for every row of this poll
+            poll_timestamp = current_time.isoformat()
+            duration_display = f"{trade_duration}s" if trade_duration < 60 else f"{trade_duration//60}:{trade_duration%60:02d}"
+            
+            # Calculate offset display
+            if self.trade_offset_seconds > 0:
+                offset_display = f"{self.trade_offset_seconds}s before signal"
+            elif self.trade_offset_seconds < 0:
+                offset_display = f"{abs(self.trade_offset_seconds)}s after signal"
+            else:
+                offset_display = "exactly at signal"
+            
+            for row in signal_rows:
                 try:
                     asset = str(row.get('asset', '')).strip()
                     direction = str(row.get('direction', '')).strip().lower()
@@ -525,20 +633,13 @@ class MultiAssetPreciseTrader:
                     
                     # Parse signal time
                     try:
-                        if signal_time_str.count(':') == 2:
-                            signal_time = datetime.strptime(signal_time_str, '%H:%M:%S')
-                        elif signal_time_str.count(':') == 1:
-                            signal_time = datetime.strptime(signal_time_str, '%H:%M')
-                        elif '.' in signal_time_str:
-                            signal_time = datetime.strptime(signal_time_str.replace('.', ':'), '%H:%M')
-                        else:
-                            continue
+                        hour, minute, second = parse_signal_time(signal_time_str)
                         
                         # Set to today's date
                         signal_datetime = current_time.replace(
-                            hour=signal_time.hour,
-                            minute=signal_time.minute,
-                            second=signal_time.second if signal_time_str.count(':') == 2 else 0,
+                            hour=hour,
+                            minute=minute,
+                            second=second,
                             microsecond=0
                         )
                         
@@ -569,25 +670,14 @@ class MultiAssetPreciseTrader:
                         'signal_datetime': signal_datetime,
                         'trade_datetime': trade_datetime,  # exactly at signal time
                         'close_datetime': trade_datetime + timedelta(seconds=trade_duration),  # Channel-specific duration
-                        'timestamp': datetime.now().isoformat(),
+                        'timestamp': poll_timestamp,
                         'message_text': str(row.get('message_text', ''))[:100],
                         'channel': self.active_channel,
                         'duration': trade_duration
                     }
                     
-                    # Debug timing
-                    current_time_for_debug = datetime.now()
-                    time_until_trade = (trade_datetime - current_time_for_debug).total_seconds()
-                    
-                    duration_display = f"{trade_duration}s" if trade_duration < 60 else f"{trade_duration//60}:{trade_duration%60:02d}"
-                    
-                    # Calculate offset display
-                    if self.trade_offset_seconds > 0:
-                        offset_display = f"{self.trade_offset_seconds}s before signal"
-                    elif self.trade_offset_seconds < 0:
-                        offset_display = f"{abs(self.trade_offset_seconds)}s after signal"
-                    else:
-                        offset_display = "exactly at signal"
+                    # Debug timing (same poll clock as time_diff above)
+                    time_until_trade = time_diff
                     
                     print(f"🔍 Signal parsed: {trading_asset} {direction} at {signal_time_str} ({channel_name})")
                     print(f"   Signal time: {signal_datetime.strftime('%H:%M:%S')}")
@@ -737,7 +827,7 @@ class MultiAssetPreciseTrader:
             
             try:
                 asset_name = self._map_asset_name(asset)
-                order_direction = OrderDirection.CALL if direction.lower() == 'call' else OrderDirection.PUT
+                order_direction = ORDER_DIRECTIONS.get(direction.lower(), OrderDirection.PUT)
                 
                 order_result = await self.client.place_order(
                     asset=asset_name,
@@ -876,7 +966,7 @@ class MultiAssetPreciseTrader:
             try:
                 # Real API execution with optimized asset format selection
                 asset_name = self._map_asset_name(asset)
-                order_direction = OrderDirection.CALL if direction.lower() == 'call' else OrderDirection.PUT
+                order_direction = ORDER_DIRECTIONS.get(direction.lower(), OrderDirection.PUT)
                 
                 print(f"🔄 Using API format: {asset_name}")
                 order_result = await self.client.place_order(
@@ -1143,7 +1233,7 @@ class MultiAssetPreciseTrader:
                         print(f"\n🔄 [{current_time_display}] No signals ready - {health_status}")
                     else:
                         print(f"\n🔄 [{current_time_display}] No signals ready - scanning for upcoming trades...")
-                    await asyncio.sleep(1)  # Check every 1 seconds for upcoming signals
+                    await self._sleep_until_next_second()  # Check every 1 seconds for upcoming signals
                     continue
                 
                 # Show upcoming signals info with precise time matching
@@ -1188,7 +1278,7 @@ class MultiAssetPreciseTrader:
                             wait_minutes = int(next_wait // 60)
                             wait_seconds = int(next_wait % 60)
                             print(f"⏰ Next signal: {next_signal['asset']} {next_signal['direction'].upper()} in {wait_minutes}m {wait_seconds}s")
-                        await asyncio.sleep(1)  # Wait 1 seconds and check again
+                        await self._sleep_until_next_second()  # Wait 1 seconds and check again
                         continue
                     
                     # Process only ready signals
@@ -1227,69 +1317,89 @@ class MultiAssetPreciseTrader:
                     if signals_to_process:
                         print("=" * 50)
                         
-                        # Create tasks for selected signals - but execute martingale sequences sequentially
+                        # One sequence per asset (each asset has its own step progression);
+                        # the sequences run concurrently so a signal due this second is not
+                        # placed minutes late behind another asset's sequence
+                        batch = {}
+                        # Sequences in a batch settle together, so the stop loss is
+                        # checked up front: only start sequences whose worst case
+                        # still fits the remaining budget (always at least one)
+                        loss_budget = None
+                        if self.stop_loss is not None:
+                            loss_budget = self.stop_loss + self.session_profit
                         for signal in signals_to_process:
                             asset = signal['asset']
-                            direction = signal['direction']
-                            
-                            # Each asset gets its own independent step progression
-                            current_step = strategy.get_asset_step(asset)
-                            
-                            print(f"📊 {asset} {direction.upper()} - {strategy.get_status(asset)}")
+                            if asset in batch:
+                                print(f"⏭️  Skipping {asset} {signal['direction'].upper()} at {signal['signal_time']} - {asset} already has a sequence this second")
+                                continue
+                            if loss_budget is not None:
+                                worst_loss = strategy.get_max_sequence_loss(asset)
+                                if batch and worst_loss > loss_budget:
+                                    print(f"⏭️  Skipping {asset} {signal['direction'].upper()} at {signal['signal_time']} - worst case ${worst_loss:.2f} exceeds remaining stop loss budget ${max(loss_budget, 0):.2f}")
+                                    continue
+                                loss_budget -= worst_loss
+                            batch[asset] = signal
+                        
+                        for asset, signal in batch.items():
+                            print(f"📊 {asset} {signal['direction'].upper()} - {strategy.get_status(asset)}")
                             print(f"⏰ Signal: {signal['signal_time']} | Trade: {signal['trade_datetime'].strftime('%H:%M:%S')}")
-                            
-                            # Execute complete martingale sequence for this asset
-                            try:
-                                print(f"🚀 EXECUTING MARTINGALE SEQUENCE FOR {asset}")
-                                
-                                # Execute the complete sequence and wait for final result
-                                final_won, total_profit = await self.execute_martingale_sequence(
-                                    asset, direction, base_amount, strategy, self.active_channel
-                                )
-                                
-                                # Update session profit using class method
-                                self.update_session_profit(total_profit)
-                                session_trades += 1  # Count as one sequence
-                                
-                                if final_won:
-                                    print(f"🎉 {asset} SEQUENCE WIN! Total profit: ${total_profit:+.2f}")
-                                else:
-                                    print(f"💔 {asset} SEQUENCE LOSS! Total loss: ${total_profit:+.2f}")
-                                
-                            except Exception as sequence_error:
-                                print(f"❌ Martingale sequence error for {asset}: {sequence_error}")
+                            print(f"🚀 EXECUTING MARTINGALE SEQUENCE FOR {asset}")
+                        
+                        # Execute the complete sequences and wait for their final results
+                        results = await asyncio.gather(
+                            *(self.execute_martingale_sequence(
+                                asset, signal['direction'], base_amount, strategy, self.active_channel
+                            ) for asset, signal in batch.items()),
+                            return_exceptions=True
+                        )
+                        
+                        for asset, result in zip(batch, results):
+                            if isinstance(result, Exception):
+                                print(f"❌ Martingale sequence error for {asset}: {result}")
                                 # Reset the asset strategy on error
                                 strategy.asset_strategies[asset] = {'step': 1, 'amounts': []}
+                                continue
                             
-                            # Show session stats after each sequence
-                            wins = len([t for t in self.trade_history if t['result'] == 'win'])
-                            losses = len([t for t in self.trade_history if t['result'] == 'loss'])
-                            
-                            print(f"\n📊 TRADING SESSION:")
-                            print(f"   💰 {self.get_session_status()}")
-                            print(f"   📈 Total Trades: {session_trades}")
-                            print(f"   🏆 Results: {wins}W/{losses}L")
+                            final_won, total_profit = result
                             
-                            # Check stop conditions after each sequence
-                            should_stop, stop_reason = self.should_stop_trading()
-                            if should_stop:
-                                print(f"\n{stop_reason}")
-                                print(f"🏁 Trading session ended")
-                                return  # Exit the trading method
+                            # Update session profit using class method
+                            self.update_session_profit(total_profit)
+                            session_trades += 1  # Count as one sequence
                             
-                            # Show current status of all active assets
-                            active_assets = strategy.get_all_active_assets()
-                            if active_assets:
-                                print(f"   📊 Asset Status:")
-                                for asset_name in active_assets:
-                                    status = strategy.get_status(asset_name)
-                                    step = strategy.get_asset_step(asset_name)
-                                    if step > 1:
-                                        print(f"      🎯 {status} (IN SEQUENCE)")
-                                    else:
-                                        print(f"      ✅ {status} (READY)")
+                            if final_won:
+                                print(f"🎉 {asset} SEQUENCE WIN! Total profit: ${total_profit:+.2f}")
+                            else:
+                                print(f"💔 {asset} SEQUENCE LOSS! Total loss: ${total_profit:+.2f}")
+                        
+                        # Show session stats after the sequences
+                        wins = len([t for t in self.trade_history if t['result'] == 'win'])
+                        losses = len([t for t in self.trade_history if t['result'] == 'loss'])
+                        
+                        print(f"\n📊 TRADING SESSION:")
+                        print(f"   💰 {self.get_session_status()}")
+                        print(f"   📈 Total Trades: {session_trades}")
+                        print(f"   🏆 Results: {wins}W/{losses}L")
+                        
+                        # Check stop conditions after the sequences
+                        should_stop, stop_reason = self.should_stop_trading()
+                        if should_stop:
+                            print(f"\n{stop_reason}")
+                            print(f"🏁 Trading session ended")
+                            return  # Exit the trading method
+                        
+                        # Show current status of all active assets
+                        active_assets = strategy.get_all_active_assets()
+                        if active_assets:
+                            print(f"   📊 Asset Status:")
+                            for asset_name in active_assets:
+                                status = strategy.get_status(asset_name)
+                                step = strategy.get_asset_step(asset_name)
+                                if step > 1:
+                                    print(f"      🎯 {status} (IN SEQUENCE)")
+                                else:
+                                    print(f"      ✅ {status} (READY)")
                 
-                await asyncio.sleep(1)  # 1s check interval
+                await self._sleep_until_next_second()  # 1s check interval
                 
         except KeyboardInterrupt:
             print(f"\n🛑 TRADING STOPPED BY USER")
@@ -1387,7 +1497,7 @@ class MultiAssetPreciseTrader:
                     # Show current time and status
                     current_time_display = datetime.now().strftime('%H:%M:%S')
                     print(f"\n🔄 [{current_time_display}] No signals ready - scanning for upcoming trades...")
-                    await asyncio.sleep(1)  # Check every 1 seconds
+                    await self._sleep_until_next_second()  # Check every 1 seconds
                     continue
                 
                 # Show upcoming signals info with precise time matching
@@ -1435,7 +1545,7 @@ class MultiAssetPreciseTrader:
                             wait_minutes = int(next_wait // 60)
                             wait_seconds = int(next_wait % 60)
                             print(f"⏰ Next signal: {next_signal['asset']} {next_signal['direction'].upper()} in {wait_minutes}m {wait_seconds}s")
-                        await asyncio.sleep(1)
+                        await self._sleep_until_next_second()
                         continue
                     
                     # Process ready signals
@@ -1496,7 +1606,7 @@ class MultiAssetPreciseTrader:
                             print(f"🏁 Trading session ended")
                             return
                 
-                await asyncio.sleep(1)  # 1s check interval
+                await self._sleep_until_next_second()  # 1s check interval
                 
         except KeyboardInterrupt:
             print(f"\n🛑 TRADING STOPPED BY USER")
@@ -1603,7 +1713,7 @@ class MultiAssetPreciseTrader:
                 if not signals:
                     current_time_display = datetime.now().strftime('%H:%M:%S')
                     print(f"\n🔄 [{current_time_display}] No signals ready - scanning...")
-                    await asyncio.sleep(1)
+                    await self._sleep_until_next_second()
                     continue
                 
                 # Check for exact time match
@@ -1620,7 +1730,7 @@ class MultiAssetPreciseTrader:
                         ready_signals.append(signal)
                 
                 if not ready_signals:
-                    await asyncio.sleep(1)
+                    await self._sleep_until_next_second()
                     continue
                 
                 # Process ready signals
@@ -1696,7 +1806,7 @@ class MultiAssetPreciseTrader:
                         print(f"🏁 Trading session ended")
                         return
                 
-                await asyncio.sleep(1)
+                await self._sleep_until_next_second()
                 
         except KeyboardInterrupt:
             print(f"\n🛑 TRADING STOPPED BY USER")
@@ -2156,4 +2266,4 @@ async def main():
     print("\n👋 Thank you for using PocketOption Automated Trader!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_main(main())
\ No newline at end of file
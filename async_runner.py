@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Shared runner for the async entry points
+"""
+
+import asyncio
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+def run_main(coro):
+    """Run coro on uvloop's libuv event loop when installed (not available on Windows), else the default asyncio loop"""
+    if uvloop:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
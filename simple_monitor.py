@@ -8,15 +8,111 @@ import logging
 import os
 import re
 import csv
+import glob
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from telethon import TelegramClient
+from telethon import TelegramClient, events, utils
+from telethon.tl.types import PeerChannel
+
+from async_runner import run_main
 
 # Load environment variables
 load_dotenv()
 
 # Disable telethon logging
 logging.basicConfig(level=logging.CRITICAL)
+logger = logging.getLogger(__name__)
+
+# CSV writer buffering: 64 KB buffer, non-signal rows flushed in batches
+# (signals and the end of each monitoring tick always flush)
+CSV_BUFFER_SIZE = 64 * 1024
+CSV_FLUSH_EVERY = 5
+
+# New messages are pushed by Telegram; polling only runs as a periodic
+# catch-up for anything missed (e.g. across a reconnect)
+CATCH_UP_INTERVAL = 30  # seconds
+
+# Recently processed message IDs kept per channel to drop messages that
+# arrive both by push and by catch-up poll
+SEEN_IDS_LIMIT = 200
+
+# Invite link -> channel ID of channels already joined, so later startups can
+# resolve them from the session instead of calling join_chat again
+ENTITY_CACHE_FILE = 'monitor_entities.json'
+
+# Channel name -> CSV filename slug
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\s-]')
+_FILENAME_SEPARATOR_RE = re.compile(r'[-\s]+')
+
+# Line breaks flattened to spaces in one pass so each CSV row stays on one line
+_NEWLINE_TRANS = str.maketrans({'\n': ' ', '\r': ' '})
+
+# Keyword classifiers for non-signal messages (one regex scan instead of
+# a substring search per keyword)
+_PATTERN_RESULT_RE = re.compile(r'win|result|✅')
+_PATTERN_PROMO_RE = re.compile(r'register|bonus|join')
+_RESULT_RE = re.compile(r'win|result|✅|confirmed|victory|gain')
+
+# A James Martin signal always carries at least one of these markers
+_SIGNAL_INDICATORS = ('VIP SIGNAL', '💳', '🔥', '⌛', 'CALL', 'PUT')
+
+# Direction markers, checked put first: (direction, emoji, uppercase words)
+_DIRECTION_MARKERS = (
+    ('put', ('🔽', '🟥'), ('PUT', 'DOWN')),
+    ('call', ('🔼', '🟩'), ('CALL', 'UP')),
+)
+
+# Words that mark results/promotions rather than signals, matched in one scan
+_SKIP_RE = re.compile(r'win|loss|💔|✅|register|code|bonus|join|channel|withdraw|verify|account')
+
+# LC Trader signal: ASSET_otc—TIME: DIRECTION (e.g. CHFJPY_otc—05:00: PUT 🔴)
+_LC_SIGNAL_RE = re.compile(r'([A-Z]{6})_otc—(\d{2}:\d{2}):\s*(PUT|CALL)', re.IGNORECASE)
+
+# James Martin asset formats, tried in priority order
+_OTC_ASSET_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'\*\*([A-Z]{6})-OTC[p]?\*\*',   # **GBPUSD-OTC** or **NZDUSD-OTCp**
+    r'💳\s*([A-Z]{6})-OTC[p]?',      # 💳 AUDCAD-OTC
+    r'([A-Z]{6})-OTC[p]?\s*-\s*(CALL|PUT)', # GBPUSD-OTC - PUT
+    r'([A-Z]{6})-OTC[p]?',           # AUDCAD-OTC
+    r'📊\s*([A-Z]{6})-OTC[p]?',      # 📊 AUDCAD-OTC
+))
+_REGULAR_ASSET_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'\*\*([A-Z]{6})\*\*',           # **GBPUSD**
+    r'💳\s*([A-Z]{6})\s',            # 💳 AUDCAD 
+    r'📊\s*([A-Z]{6})',              # 📊 AUDCAD
+))
+
+# Signal time formats, compiled once and tried in priority order; an
+# alternation would pick the leftmost timestamp instead
+_TIME_RES = tuple(re.compile(p) for p in (
+    r'PUT\s*🟥\s*-\s*(\d{1,2}:\d{2})',  # PUT 🟥 - 00:37
+    r'CALL\s*🟩\s*-\s*(\d{1,2}:\d{2})', # CALL 🟩 - 00:37
+    r'-\s*(\d{1,2}:\d{2})\s*•',         # - 21:32 •
+    r'⌛\s*(\d{1,2}:\d{2}:\d{2})',      # ⌛ 12:25:00
+    r'⌛\s*(\d{1,2}:\d{2})',           # ⌛ 12:25
+    r'⏰\s*(\d{1,2}:\d{2})',           # ⏰ 12:25
+    r'-\s*(\d{1,2}:\d{2})$',           # - 21:32 at end
+    r'(\d{1,2}:\d{2})\s*•',            # 21:32 •
+))
+
+# (epoch second, 'YYYY-MM-DD HH:MM:SS') of the last formatted timestamp;
+# swapped as a whole tuple so CSV writer threads always see a matching pair
+_now_cache = (0, '')
+
+def _now_str():
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', formatted once per second"""
+    global _now_cache
+    sec = int(time.time())
+    cached_sec, cached_str = _now_cache
+    if sec != cached_sec:
+        cached_str = datetime.fromtimestamp(sec).isoformat(sep=' ', timespec='seconds')
+        _now_cache = (sec, cached_str)
+    return cached_str
 
 class SimpleMonitor:
     def __init__(self):
@@ -45,16 +141,52 @@ class SimpleMonitor:
             # }
         ]
         
+        # Bind each channel to its signal extractor once (LC Trader has its own format)
+        for channel in self.channels:
+            if 'lc trader' in channel['name'].lower():
+                channel['extractor'] = self.extract_lc_trader_signal
+            else:
+                channel['extractor'] = self.extract_james_martin_signal
+            
+            # last_msg_id is the catch-up poll's watermark and only polled
+            # messages advance it; pushes are deduplicated by ID instead, so
+            # a push after a gap can't hide the gap from the next poll
+            channel['seen_ids'] = set()
+            channel['seen_order'] = deque()
+        
+        self.entity_cache = self.load_entity_cache()
+        
         # CSV file setup - separate file for each channel
         # Will be updated dynamically when date changes
         self.csv_files = {}
         self.current_date = None  # Track current date for automatic updates
         
+        # Persistent buffered writers, one per channel CSV file; rows written
+        # since the last flush are counted per channel. Rows are written from
+        # worker threads while the monitor loop flushes and rotates files, so
+        # all access goes through csv_lock
+        self.csv_writers = {}
+        self.unflushed_rows = {}
+        self.csv_lock = threading.Lock()
+        
+        # Rows are handed to one dedicated writer thread so they reach the
+        # CSV in the order the messages were processed
+        self.csv_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='csv-writer')
+        
+        # Channel checks run concurrently, so a database error can hit several
+        # at once; only one of them recreates the session. The generation
+        # counts recreations so checks queued behind it can tell it's done
+        self.session_lock = asyncio.Lock()
+        self.session_generation = 0
+        
         # Initialize CSV files for today
         self.update_csv_files_for_date()
         
-        self.current_channel = 0
         self.running = False
+        self.last_catch_up_time = None
+        
+        # Monitored channels keyed by Telegram peer id, for push updates
+        self.channels_by_chat_id = {}
         
         # Session statistics
         self.session_start = datetime.now()
@@ -64,7 +196,8 @@ class SimpleMonitor:
     
     def update_csv_files_for_date(self):
         """Update CSV filenames based on current date"""
-        today = datetime.now().strftime('%Y%m%d')
+        # Derived from the per-second timestamp cache rather than a strftime every tick
+        today = _now_str()[:10].replace('-', '')
         
         # Check if date has changed
         if self.current_date != today:
@@ -74,13 +207,14 @@ class SimpleMonitor:
             # Create CSV file for each channel with new date
             for channel in self.channels:
                 # Create safe filename from channel name
-                safe_name = re.sub(r'[^\w\s-]', '', channel['name']).strip()
-                safe_name = re.sub(r'[-\s]+', '_', safe_name).lower()
+                safe_name = _UNSAFE_FILENAME_RE.sub('', channel['name']).strip()
+                safe_name = _FILENAME_SEPARATOR_RE.sub('_', safe_name).lower()
                 csv_filename = f"pocketoption_{safe_name}_{today}.csv"
                 self.csv_files[channel['name']] = csv_filename
             
             # Ensure all CSV files have headers
             self.ensure_csv_headers()
+            self.open_csv_writers()
             
             # Log the date change
             if old_date:
@@ -112,6 +246,33 @@ class SimpleMonitor:
             else:
                 print(f"📄 Using existing CSV file for {channel_name}: {csv_file}")
     
+    def open_csv_writers(self):
+        """Open a persistent buffered writer for each channel's CSV file"""
+        self.close_csv_writers()
+        with self.csv_lock:
+            for channel_name, csv_file in self.csv_files.items():
+                f = open(csv_file, 'a', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
+                self.csv_writers[channel_name] = (f, csv.writer(f))
+    
+    def flush_csv_writers(self):
+        """Flush CSV writers that have buffered rows to disk"""
+        with self.csv_lock:
+            for channel_name, (f, _) in self.csv_writers.items():
+                if self.unflushed_rows.get(channel_name):
+                    f.flush()
+            self.unflushed_rows.clear()
+    
+    def close_csv_writers(self):
+        """Flush and close all open CSV writers"""
+        with self.csv_lock:
+            for f, _ in self.csv_writers.values():
+                try:
+                    f.close()
+                except Exception as e:
+                    print(f"⚠️ Could not close {f.name}: {e}")
+            self.csv_writers.clear()
+            self.unflushed_rows.clear()
+    
     async def fetch_last_message_pattern(self, channel):
         """Fetch the last 10 messages from channel to learn pattern"""
         if not channel['entity']:
@@ -132,28 +293,34 @@ class SimpleMonitor:
             
             for i, msg in enumerate(messages):
                 if msg.text:
-                    print(f"📨 Message {i+1} (ID: {msg.id}):")
-                    print(f"   📝 Text: {msg.text[:200]}...")
+                    # Collect the report for this message and print it in one call
+                    lines = [
+                        f"📨 Message {i+1} (ID: {msg.id}):",
+                        f"   📝 Text: {msg.text[:200]}...",
+                    ]
                     
                     # Analyze for signal patterns
-                    signal_data = self.extract_signal_data(msg.text, channel['name'])
+                    text_lower = msg.text.lower()
+                    signal_data = channel['extractor'](msg.text, text_lower)
                     if signal_data:
-                        print(f"   🎯 SIGNAL DETECTED:")
-                        print(f"      💰 Asset: {signal_data['asset']}")
-                        print(f"      📊 Direction: {signal_data['direction']}")
-                        print(f"      ⏰ Time: {signal_data['signal_time'] or 'Not specified'}")
+                        lines += [
+                            f"   🎯 SIGNAL DETECTED:",
+                            f"      💰 Asset: {signal_data['asset']}",
+                            f"      📊 Direction: {signal_data['direction']}",
+                            f"      ⏰ Time: {signal_data['signal_time'] or 'Not specified'}",
+                        ]
                         patterns_found.append(signal_data)
                     else:
                         # Check for other patterns
-                        text_lower = msg.text.lower()
-                        if any(word in text_lower for word in ['win', 'result', '✅']):
-                            print(f"   📊 RESULT MESSAGE detected")
-                        elif any(word in text_lower for word in ['register', 'bonus', 'join']):
-                            print(f"   📢 PROMOTIONAL MESSAGE detected")
+                        if _PATTERN_RESULT_RE.search(text_lower):
+                            lines.append(f"   📊 RESULT MESSAGE detected")
+                        elif _PATTERN_PROMO_RE.search(text_lower):
+                            lines.append(f"   📢 PROMOTIONAL MESSAGE detected")
                         else:
-                            print(f"   📝 REGULAR MESSAGE")
+                            lines.append(f"   📝 REGULAR MESSAGE")
                     
-                    print()
+                    lines.append('')
+                    print('\n'.join(lines))
             
             if patterns_found:
                 print(f"✅ Found {len(patterns_found)} signal patterns in last 10 messages from {channel['name']}")
@@ -167,6 +334,67 @@ class SimpleMonitor:
             print(f"❌ Error fetching patterns from {channel['name']}: {e}")
             return None
     
+    def load_entity_cache(self):
+        """Load cached channel IDs from previous runs"""
+        try:
+            with open(ENTITY_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_entity_cache(self):
+        """Persist cached channel IDs for the next startup"""
+        try:
+            with open(ENTITY_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self.entity_cache, f)
+        except OSError as e:
+            print(f"⚠️ Could not save channel cache: {e}")
+    
+    async def resolve_channel(self, channel):
+        """Resolve a channel's entity and latest message ID, joining it if needed"""
+        entity = None
+        
+        # Already joined on a previous run: the session knows the channel by ID
+        cached_id = self.entity_cache.get(channel['id'])
+        if cached_id:
+            try:
+                entity = await self.telegram_client.get_entity(PeerChannel(cached_id))
+            except Exception:
+                entity = None  # e.g. session was recreated; fall back to joining
+        
+        if entity is None:
+            # Handle invite link
+            if 'joinchat' in channel['id'] or '+' in channel['id']:
+                # Extract invite hash from link
+                if '+' in channel['id']:
+                    invite_hash = channel['id'].split('+')[-1]
+                else:
+                    invite_hash = channel['id'].split('/')[-1]
+                
+                # Join channel using invite link
+                try:
+                    result = await self.telegram_client.join_chat(invite_hash)
+                    entity = result.chats[0]
+                except Exception as join_error:
+                    print(f"⚠️ Could not join channel: {join_error}")
+                    # Try to get entity directly
+                    entity = await self.telegram_client.get_entity(channel['id'])
+            else:
+                entity = await self.telegram_client.get_entity(channel['id'])
+        
+        channel['entity'] = entity
+        
+        if cached_id != entity.id:
+            self.entity_cache[channel['id']] = entity.id
+            self.save_entity_cache()
+        
+        # Get the latest message ID to start from; on a reconnect keep the
+        # existing watermark so the catch-up poll recovers the gap
+        if channel['last_msg_id'] is None:
+            messages = await self.telegram_client.get_messages(entity, limit=1)
+            if messages:
+                channel['last_msg_id'] = messages[0].id
+    
     async def initialize(self):
         """Initialize clients with session reuse and authentication"""
         try:
@@ -192,14 +420,7 @@ class SimpleMonitor:
                     print("🔄 Creating new session...")
                     
                     # Clean invalid session files
-                    session_files = ['monitor_session.session', 'monitor_session.session-journal', 'monitor_session.session-wal']
-                    for session_file in session_files:
-                        if os.path.exists(session_file):
-                            try:
-                                os.remove(session_file)
-                                print(f"🧹 Cleaned: {session_file}")
-                            except Exception as e:
-                                print(f"⚠️ Could not remove {session_file}: {e}")
+                    self.clean_session_files()
                     
                     # Recreate client and authenticate
                     self.telegram_client = TelegramClient('monitor_session', self.api_id, self.api_hash)
@@ -220,31 +441,7 @@ class SimpleMonitor:
             print("📡 Connecting to channels and analyzing patterns...")
             for channel in self.channels:
                 try:
-                    # Handle invite link
-                    if 'joinchat' in channel['id'] or '+' in channel['id']:
-                        # Extract invite hash from link
-                        if '+' in channel['id']:
-                            invite_hash = channel['id'].split('+')[-1]
-                        else:
-                            invite_hash = channel['id'].split('/')[-1]
-                        
-                        # Join channel using invite link
-                        try:
-                            result = await self.telegram_client.join_chat(invite_hash)
-                            entity = result.chats[0]
-                        except Exception as join_error:
-                            print(f"⚠️ Could not join channel: {join_error}")
-                            # Try to get entity directly
-                            entity = await self.telegram_client.get_entity(channel['id'])
-                    else:
-                        entity = await self.telegram_client.get_entity(channel['id'])
-                    
-                    channel['entity'] = entity
-                    
-                    # Get the latest message ID to start from
-                    messages = await self.telegram_client.get_messages(entity, limit=1)
-                    if messages:
-                        channel['last_msg_id'] = messages[0].id
+                    await self.resolve_channel(channel)
                     
                     print(f"✅ {channel['name']}: Connected")
                     
@@ -254,12 +451,23 @@ class SimpleMonitor:
                 except Exception as e:
                     print(f"❌ {channel['name']}: Failed to connect - {e}")
             
+            self.register_message_handler()
             return True
             
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             return False
     
+    def clean_session_files(self):
+        """Remove the monitor session database and its SQLite companion files"""
+        # One directory match covers -journal, -wal, -shm and anything else SQLite adds
+        for session_file in glob.glob('monitor_session.session*'):
+            try:
+                os.remove(session_file)
+                print(f"🧹 Cleaned: {session_file}")
+            except OSError as e:
+                print(f"⚠️ Could not remove {session_file}: {e}")
+    
     async def authenticate_new_session(self):
         """Handle new session authentication with OTP and password"""
         try:
@@ -322,29 +530,15 @@ class SimpleMonitor:
             print(f"❌ 2FA error: {e}")
             return False
     
-    def extract_signal_data(self, message_text, channel_name):
-        """Extract signal data from message based on channel type"""
-        if not message_text:
-            return None
-        
-        # LC Trader channel pattern
-        if 'lc trader' in channel_name.lower():
-            return self.extract_lc_trader_signal(message_text)
-        
-        # James Martin VIP channel pattern (original)
-        return self.extract_james_martin_signal(message_text)
-    
-    def extract_lc_trader_signal(self, message_text):
+    def extract_lc_trader_signal(self, message_text, text_lower=None):
         """Extract signal data from LC Trader message format"""
+        # text_lower is unused; it keeps the signature shared with the James Martin extractor
         # Check for LC Trader signal pattern: "OPPORTUNITY FOUND"
         if "OPPORTUNITY FOUND" not in message_text:
             return None
         
         # Pattern: ASSET_otc—TIME: DIRECTION
-        # Example: CHFJPY_otc—05:00: PUT 🔴
-        signal_pattern = r'([A-Z]{6})_otc—(\d{2}:\d{2}):\s*(PUT|CALL)'
-        
-        match = re.search(signal_pattern, message_text, re.IGNORECASE)
+        match = _LC_SIGNAL_RE.search(message_text)
         if not match:
             return None
         
@@ -358,86 +552,56 @@ class SimpleMonitor:
             'signal_time': signal_time
         }
     
-    def extract_james_martin_signal(self, message_text):
+    def extract_james_martin_signal(self, message_text, text_lower=None):
         """Extract signal data from James Martin VIP channel format"""
-        # Skip obvious non-signal messages
-        skip_words = ['win', 'loss', '💔', '✅', 'register', 'code', 'bonus', 'join', 'channel', 'withdraw', 'verify', 'account']
-        if any(skip_word in message_text.lower() for skip_word in skip_words):
-            # But allow if it has VIP SIGNAL
-            if 'VIP SIGNAL' not in message_text:
-                return None
+        # Must have VIP SIGNAL or signal indicators (cheapest check, done first)
+        if not any(indicator in message_text for indicator in _SIGNAL_INDICATORS):
+            return None
         
-        # Must have VIP SIGNAL or signal indicators
-        if not any(indicator in message_text for indicator in ['VIP SIGNAL', '💳', '🔥', '⌛', 'CALL', 'PUT']):
+        # Skip obvious non-signal messages
+        if text_lower is None:
+            text_lower = message_text.lower()
+        if _SKIP_RE.search(text_lower) and 'VIP SIGNAL' not in message_text:
+            # Allowed through only if it has VIP SIGNAL
             return None
         
         # Extract Asset - preserve full format including OTC
         asset = None
         
         # First try to match full OTC format patterns
-        otc_patterns = [
-            r'\*\*([A-Z]{6})-OTC[p]?\*\*',   # **GBPUSD-OTC** or **NZDUSD-OTCp**
-            r'💳\s*([A-Z]{6})-OTC[p]?',      # 💳 AUDCAD-OTC
-            r'([A-Z]{6})-OTC[p]?\s*-\s*(CALL|PUT)', # GBPUSD-OTC - PUT
-            r'([A-Z]{6})-OTC[p]?',           # AUDCAD-OTC
-            r'📊\s*([A-Z]{6})-OTC[p]?',      # 📊 AUDCAD-OTC
-        ]
-        
-        # Check for OTC format first
-        for pattern in otc_patterns:
-            asset_match = re.search(pattern, message_text, re.IGNORECASE)
+        for pattern in _OTC_ASSET_RES:
+            asset_match = pattern.search(message_text)
             if asset_match:
-                base_asset = asset_match.group(1).upper()
-                if len(base_asset) == 6:  # Ensure it's a valid currency pair
-                    asset = f"{base_asset}_otc"  # Convert GBPUSD to GBPUSD_otc
-                    break
+                # The capture group is exactly six letters, so no length check is needed
+                asset = f"{asset_match.group(1).upper()}_otc"  # Convert GBPUSD to GBPUSD_otc
+                break
         
         # If no OTC format found, try regular patterns
         if not asset:
-            regular_patterns = [
-                r'\*\*([A-Z]{6})\*\*',           # **GBPUSD**
-                r'💳\s*([A-Z]{6})\s',            # 💳 AUDCAD 
-                r'📊\s*([A-Z]{6})',              # 📊 AUDCAD
-            ]
-            
-            for pattern in regular_patterns:
-                asset_match = re.search(pattern, message_text, re.IGNORECASE)
+            for pattern in _REGULAR_ASSET_RES:
+                asset_match = pattern.search(message_text)
                 if asset_match:
                     asset = asset_match.group(1).upper()
-                    # Ensure it's 6 characters (currency pair)
-                    if len(asset) == 6:
-                        break
+                    break
         
         if not asset:
             return None
         
         # Extract time
         signal_time = None
-        time_patterns = [
-            r'PUT\s*🟥\s*-\s*(\d{1,2}:\d{2})',  # PUT 🟥 - 00:37
-            r'CALL\s*🟩\s*-\s*(\d{1,2}:\d{2})', # CALL 🟩 - 00:37
-            r'-\s*(\d{1,2}:\d{2})\s*•',         # - 21:32 •
-            r'⌛\s*(\d{1,2}:\d{2}:\d{2})',      # ⌛ 12:25:00
-            r'⌛\s*(\d{1,2}:\d{2})',           # ⌛ 12:25
-            r'⏰\s*(\d{1,2}:\d{2})',           # ⏰ 12:25
-            r'-\s*(\d{1,2}:\d{2})$',           # - 21:32 at end
-            r'(\d{1,2}:\d{2})\s*•',            # 21:32 •
-        ]
-        
-        for pattern in time_patterns:
-            time_match = re.search(pattern, message_text)
+        for pattern in _TIME_RES:
+            time_match = pattern.search(message_text)
             if time_match:
                 signal_time = time_match.group(1)
                 break
         
-        # Extract direction
-        direction = None
-        if '🔽' in message_text or 'PUT' in message_text.upper() or 'DOWN' in message_text.upper() or '🟥' in message_text:
-            direction = 'put'
-        elif '🔼' in message_text or 'CALL' in message_text.upper() or 'UP' in message_text.upper() or '🟩' in message_text:
-            direction = 'call'
-        
-        if not direction:
+        # Extract direction: emoji on the raw text, words on one uppercased copy
+        text_upper = message_text.upper()
+        for direction, emojis, words in _DIRECTION_MARKERS:
+            if (any(emoji in message_text for emoji in emojis)
+                    or any(word in text_upper for word in words)):
+                break
+        else:
             return None
         
         return {
@@ -446,6 +610,19 @@ class SimpleMonitor:
             'signal_time': signal_time
         }
     
+    def _format_row(self, channel, message, signal_data=None):
+        """Build the CSV row for a message"""
+        timestamp = _now_str()
+        message_text = message.text.translate(_NEWLINE_TRANS) if message.text else ''
+        
+        if signal_data:
+            return [timestamp, channel['name'], message.id, message_text,
+                    'Yes', signal_data['asset'], signal_data['direction'],
+                    signal_data['signal_time'] or '']
+        
+        return [timestamp, channel['name'], message.id, message_text,
+                'No', '', '', '']
+    
     def save_to_csv(self, channel, message, signal_data=None):
         """Save message to channel-specific CSV file"""
         try:
@@ -455,109 +632,152 @@ class SimpleMonitor:
                 print(f"❌ No CSV file found for channel: {channel['name']}")
                 return False
             
-            with open(csv_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                
-                # Prepare row data
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                channel_name = channel['name']
-                message_id = message.id
-                message_text = message.text.replace('\n', ' ').replace('\r', ' ') if message.text else ''
-                
-                if signal_data:
-                    is_signal = 'Yes'
-                    asset = signal_data['asset']
-                    direction = signal_data['direction']
-                    signal_time = signal_data['signal_time'] or ''
-                    
-                    # Debug logging for signal data
-                    print(f"   💾 Saving signal to {csv_file}: {asset} {direction} at {signal_time}")
-                else:
-                    is_signal = 'No'
-                    asset = ''
-                    direction = ''
-                    signal_time = ''
-                
-                row = [timestamp, channel_name, message_id, message_text, 
-                       is_signal, asset, direction, signal_time]
+            row = self._format_row(channel, message, signal_data)
+            
+            if signal_data:
+                # Debug logging for signal data (check_channel already reports signals)
+                logger.debug("Saving signal to %s: %s %s at %s", csv_file, row[5], row[6], row[7])
+            
+            with self.csv_lock:
+                handle = self.csv_writers.get(channel['name'])
+                if not handle:
+                    print(f"❌ No CSV file found for channel: {channel['name']}")
+                    return False
                 
+                f, writer = handle
                 writer.writerow(row)
+                unflushed = self.unflushed_rows.get(channel['name'], 0) + 1
+                
+                # Signals are flushed right away so traders reading the CSV see them
+                if signal_data or unflushed >= CSV_FLUSH_EVERY:
+                    f.flush()
+                    unflushed = 0
+                self.unflushed_rows[channel['name']] = unflushed
                 return True
                 
         except Exception as e:
             print(f"         ❌ CSV save error: {e}")
             return False
     
+    async def process_message(self, channel, msg):
+        """Report and save one message; returns False if it was already seen"""
+        # Skip if we've already seen this message (by push or by poll)
+        seen_ids = channel['seen_ids']
+        if msg.id in seen_ids:
+            return False
+        seen_ids.add(msg.id)
+        channel['seen_order'].append(msg.id)
+        if len(seen_ids) > SEEN_IDS_LIMIT:
+            seen_ids.discard(channel['seen_order'].popleft())
+        
+        self.messages_processed += 1
+        
+        if msg.text:
+            # Show message in real-time format
+            time_str = _now_str()[11:]
+            message_preview = msg.text[:150].translate(_NEWLINE_TRANS)
+            text_lower = msg.text.lower()
+            
+            # Check if it's a signal with the channel's own extractor
+            signal_data = channel['extractor'](msg.text, text_lower)
+            
+            # Save to CSV off the event loop thread
+            saved = await asyncio.get_running_loop().run_in_executor(
+                self.csv_executor, self.save_to_csv, channel, msg, signal_data
+            )
+            
+            # Collect the report for this message and print it in one call
+            lines = [
+                f"\n🔔 [{time_str}] NEW MESSAGE from {channel['name']}:",
+                f"   📝 {message_preview}",
+            ]
+            
+            if signal_data:
+                self.signals_detected += 1
+                # Show detailed signal info
+                save_status = "✅ SAVED TO CSV" if saved else "❌ SAVE FAILED"
+                lines += [
+                    f"   🎯 TRADING SIGNAL DETECTED:",
+                    f"      💰 Asset: {signal_data['asset']}",
+                    f"      📊 Direction: {signal_data['direction'].upper()}",
+                    f"      ⏰ Time: {signal_data['signal_time'] or 'Not specified'}",
+                    f"      💾 Status: {save_status}",
+                    f"      📊 Session Signals: {self.signals_detected}",
+                    f"   🚨 READY FOR TRADING!",
+                ]
+            else:
+                # Check if it's a result message
+                if _RESULT_RE.search(text_lower):
+                    save_status = "📊 RESULT SAVED" if saved else "❌ SAVE FAILED"
+                    lines.append(f"   📊 RESULT MESSAGE: {save_status}")
+                else:
+                    save_status = "📝 MESSAGE SAVED" if saved else "❌ SAVE FAILED"
+                    lines.append(f"   📝 Status: {save_status}")
+        else:
+            # Media message
+            saved = await asyncio.get_running_loop().run_in_executor(
+                self.csv_executor, self.save_to_csv, channel, msg, None
+            )
+            time_str = _now_str()[11:]
+            save_status = "📷 MEDIA SAVED" if saved else "❌ SAVE FAILED"
+            lines = [
+                f"\n🔔 [{time_str}] NEW MEDIA MESSAGE from {channel['name']}",
+                f"   📷 Status: {save_status}",
+            ]
+        
+        # Show which CSV file was used
+        csv_file = self.csv_files.get(channel['name'], 'Unknown')
+        lines += [f"   📄 CSV: {csv_file}", "-" * 60]
+        print('\n'.join(lines))
+        
+        return True
+    
+    async def on_new_message(self, event):
+        """Handle a message pushed by Telegram for one of the monitored channels"""
+        channel = self.channels_by_chat_id.get(event.chat_id)
+        if not channel:
+            return
+        
+        try:
+            await self.process_message(channel, event.message)
+        except Exception as e:
+            print(f"❌ [{_now_str()[11:]}] Error handling message from {channel['name']}: {e}")
+    
+    def register_message_handler(self):
+        """Subscribe to push updates for every connected channel"""
+        connected = [channel for channel in self.channels if channel['entity']]
+        self.channels_by_chat_id = {
+            utils.get_peer_id(channel['entity']): channel for channel in connected
+        }
+        if connected:
+            self.telegram_client.add_event_handler(
+                self.on_new_message,
+                events.NewMessage(chats=[channel['entity'] for channel in connected])
+            )
+    
     async def check_channel(self, channel):
         """Check one channel for new messages"""
         if not channel['entity']:
             return
         
+        session_generation = self.session_generation
         try:
-            # Get latest messages (check more messages for better detection)
-            messages = await self.telegram_client.get_messages(channel['entity'], limit=10)
+            # Let the server return only messages newer than the last one seen
+            messages = await self.telegram_client.get_messages(
+                channel['entity'], limit=10, min_id=channel['last_msg_id'] or 0
+            )
             
             new_messages_found = False
             
-            for msg in messages:
-                # Skip if we've already seen this message
-                if channel['last_msg_id'] and msg.id <= channel['last_msg_id']:
-                    continue
-                
-                new_messages_found = True
-                self.messages_processed += 1
-                
-                # Update last seen message ID
-                if not channel['last_msg_id'] or msg.id > channel['last_msg_id']:
-                    channel['last_msg_id'] = msg.id
-                
-                if msg.text:
-                    # Show message in real-time format
-                    time_str = datetime.now().strftime('%H:%M:%S')
-                    message_preview = msg.text.replace('\n', ' ')[:150]
-                    print(f"\n🔔 [{time_str}] NEW MESSAGE from {channel['name']}:")
-                    print(f"   📝 {message_preview}")
-                    
-                    # Check if it's a signal with detailed analysis (pass channel name)
-                    signal_data = self.extract_signal_data(msg.text, channel['name'])
-                    
-                    # Save to CSV
-                    saved = self.save_to_csv(channel, msg, signal_data)
-                    
-                    if signal_data:
-                        self.signals_detected += 1
-                        # Show detailed signal info
-                        save_status = "✅ SAVED TO CSV" if saved else "❌ SAVE FAILED"
-                        print(f"   🎯 TRADING SIGNAL DETECTED:")
-                        print(f"      💰 Asset: {signal_data['asset']}")
-                        print(f"      📊 Direction: {signal_data['direction'].upper()}")
-                        print(f"      ⏰ Time: {signal_data['signal_time'] or 'Not specified'}")
-                        print(f"      💾 Status: {save_status}")
-                        print(f"      📊 Session Signals: {self.signals_detected}")
-                        print(f"   🚨 READY FOR TRADING!")
-                    else:
-                        # Check if it's a result message
-                        if any(word in msg.text.lower() for word in ['win', 'result', '✅', 'confirmed', 'victory', 'gain']):
-                            save_status = "📊 RESULT SAVED" if saved else "❌ SAVE FAILED"
-                            print(f"   📊 RESULT MESSAGE: {save_status}")
-                        else:
-                            save_status = "📝 MESSAGE SAVED" if saved else "❌ SAVE FAILED"
-                            print(f"   📝 Status: {save_status}")
-                    
-                    # Show which CSV file was used
-                    csv_file = self.csv_files.get(channel['name'], 'Unknown')
-                    print(f"   📄 CSV: {csv_file}")
-                    print("-" * 60)
-                else:
-                    # Media message
-                    saved = self.save_to_csv(channel, msg, None)
-                    time_str = datetime.now().strftime('%H:%M:%S')
-                    print(f"\n🔔 [{time_str}] NEW MEDIA MESSAGE from {channel['name']}")
-                    save_status = "📷 MEDIA SAVED" if saved else "❌ SAVE FAILED"
-                    print(f"   📷 Status: {save_status}")
-                    csv_file = self.csv_files.get(channel['name'], 'Unknown')
-                    print(f"   📄 CSV: {csv_file}")
-                    print("-" * 60)
+            # Oldest first; pushed messages are skipped by ID, so a push landing
+            # mid-batch doesn't cut the rest of the batch short
+            for msg in reversed(messages):
+                if await self.process_message(channel, msg):
+                    new_messages_found = True
+            
+            # Only polled messages move the poll watermark
+            if messages:
+                channel['last_msg_id'] = max(channel['last_msg_id'] or 0, max(msg.id for msg in messages))
             
             # Show monitoring status every 30 seconds if no new messages
             if not new_messages_found:
@@ -566,41 +786,41 @@ class SimpleMonitor:
                     self.last_status_time = current_time
                 
                 if (current_time - self.last_status_time).seconds >= 30:
-                    time_str = current_time.strftime('%H:%M:%S')
+                    time_str = _now_str()[11:]
                     print(f"⏰ [{time_str}] Monitoring {channel['name']} - No new messages")
                     self.last_status_time = current_time
         
         except Exception as e:
             error_msg = str(e).lower()
-            time_str = datetime.now().strftime('%H:%M:%S')
+            time_str = _now_str()[11:]
             
             # Handle specific database errors
             if 'readonly database' in error_msg or 'database is locked' in error_msg:
-                print(f"🔄 [{time_str}] Database issue detected - recreating session...")
-                # Try to recreate the session
-                try:
-                    await self.telegram_client.disconnect()
-                    await asyncio.sleep(2)
-                    
-                    # Clean session files
-                    session_files = ['monitor_session.session', 'monitor_session.session-journal', 'monitor_session.session-wal']
-                    for session_file in session_files:
-                        if os.path.exists(session_file):
-                            try:
-                                os.remove(session_file)
-                            except:
-                                pass
-                    
-                    # Recreate client
-                    self.telegram_client = TelegramClient('monitor_session', self.api_id, self.api_hash)
-                    await self.authenticate_new_session()
-                    
-                    # Reconnect to channels
-                    await self.reconnect_channels()
-                    print(f"✅ [{time_str}] Session recreated successfully")
-                    
-                except Exception as reconnect_error:
-                    print(f"❌ [{time_str}] Failed to recreate session: {reconnect_error}")
+                async with self.session_lock:
+                    if self.session_generation != session_generation:
+                        return  # Another channel check already recreated the session
+                    print(f"🔄 [{time_str}] Database issue detected - recreating session...")
+                    # Try to recreate the session
+                    try:
+                        await self.telegram_client.disconnect()
+                        await asyncio.sleep(2)
+                        
+                        # Clean session files
+                        self.clean_session_files()
+                        
+                        # Recreate client
+                        self.telegram_client = TelegramClient('monitor_session', self.api_id, self.api_hash)
+                        await self.authenticate_new_session()
+                        
+                        # Reconnect to channels
+                        await self.reconnect_channels()
+                        print(f"✅ [{time_str}] Session recreated successfully")
+                        
+                    except Exception as reconnect_error:
+                        print(f"❌ [{time_str}] Failed to recreate session: {reconnect_error}")
+                    # Counted even on failure so the queued checks don't retry it
+                    # all at once; the next catch-up poll tries again
+                    self.session_generation += 1
             else:
                 print(f"❌ [{time_str}] Error checking {channel['name']}: {e}")
     
@@ -609,36 +829,14 @@ class SimpleMonitor:
         print("📡 Reconnecting to channels...")
         for channel in self.channels:
             try:
-                # Handle invite link
-                if 'joinchat' in channel['id'] or '+' in channel['id']:
-                    # Extract invite hash from link
-                    if '+' in channel['id']:
-                        invite_hash = channel['id'].split('+')[-1]
-                    else:
-                        invite_hash = channel['id'].split('/')[-1]
-                    
-                    # Join channel using invite link
-                    try:
-                        result = await self.telegram_client.join_chat(invite_hash)
-                        entity = result.chats[0]
-                    except Exception as join_error:
-                        print(f"⚠️ Could not join channel: {join_error}")
-                        # Try to get entity directly
-                        entity = await self.telegram_client.get_entity(channel['id'])
-                else:
-                    entity = await self.telegram_client.get_entity(channel['id'])
-                
-                channel['entity'] = entity
-                
-                # Get the latest message ID to start from
-                messages = await self.telegram_client.get_messages(entity, limit=1)
-                if messages:
-                    channel['last_msg_id'] = messages[0].id
+                await self.resolve_channel(channel)
                 
                 print(f"✅ {channel['name']}: Reconnected")
                 
             except Exception as e:
                 print(f"❌ {channel['name']}: Failed to reconnect - {e}")
+        
+        self.register_message_handler()
     
     async def start_monitoring(self):
         """Start real-time signal monitoring"""
@@ -646,7 +844,7 @@ class SimpleMonitor:
         print(f"📄 CSV Files: Separate file for each channel")
         for channel_name, csv_file in self.csv_files.items():
             print(f"   📊 {channel_name}: {csv_file}")
-        print("⚡ Monitoring: Every 1 second")
+        print(f"⚡ Monitoring: Push updates + catch-up every {CATCH_UP_INTERVAL} seconds")
         print("🎯 Detection: Trading signals + Results")
         print("📊 Format: [time] NEW MESSAGE details")
         print("🚨 Alerts: Real-time signal notifications")
@@ -675,14 +873,21 @@ class SimpleMonitor:
                 # Check if date has changed and update CSV files if needed
                 self.update_csv_files_for_date()
                 
-                # Check current channel
-                channel = self.channels[self.current_channel]
-                await self.check_channel(channel)
+                # New messages arrive through on_new_message; poll all channels
+                # concurrently only as a periodic catch-up
+                now = datetime.now()
+                if (self.last_catch_up_time is None
+                        or (now - self.last_catch_up_time).total_seconds() >= CATCH_UP_INTERVAL):
+                    self.last_catch_up_time = now
+                    await asyncio.gather(
+                        *(self.check_channel(channel) for channel in self.channels),
+                        return_exceptions=True
+                    )
                 
-                # Move to next channel
-                self.current_channel = (self.current_channel + 1) % len(self.channels)
+                # Flush any rows still sitting in the write buffers
+                self.flush_csv_writers()
                 
-                # Wait 1 second for real-time monitoring
+                # Wait 1 second before the next housekeeping tick
                 await asyncio.sleep(1)
                 
         except KeyboardInterrupt:
@@ -707,6 +912,9 @@ class SimpleMonitor:
             await asyncio.sleep(5)
         finally:
             self.running = False
+            # Let queued rows land before the files are closed
+            self.csv_executor.shutdown(wait=True)
+            self.close_csv_writers()
             if self.telegram_client:
                 try:
                     await self.telegram_client.disconnect()
@@ -719,4 +927,4 @@ async def main():
     await monitor.start_monitoring()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_main(main())
\ No newline at end of file
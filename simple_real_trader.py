@@ -7,14 +7,26 @@ Executes actual $1 CALL trades on PocketOption
 import os
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any
 from dotenv import load_dotenv
 
-# Import PocketOption API
-from pocketoptionapi_async import AsyncPocketOptionClient
-from pocketoptionapi_async.models import OrderDirection
-from pocketoptionapi_async.constants import ASSETS
+from async_runner import run_main
+
+# PocketOption API, imported on first use by load_api() so the menu comes up
+# without pulling in the client's websocket stack
+AsyncPocketOptionClient = None
+OrderDirection = None
+ASSETS = None
+
+def load_api():
+    """Import the PocketOption API the first time a trader needs it"""
+    global AsyncPocketOptionClient, OrderDirection, ASSETS
+    if ASSETS is None:
+        from pocketoptionapi_async import AsyncPocketOptionClient
+        from pocketoptionapi_async.models import OrderDirection
+        from pocketoptionapi_async.constants import ASSETS
 
 # Load environment variables
 load_dotenv()
@@ -23,14 +35,20 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Major pairs trade under their plain name; every other pair needs the _otc suffix
+MAJOR_PAIRS = frozenset({'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'USDCAD', 'AUDUSD'})
+
 class SimpleRealTrader:
     """Simple real trader using proven SSID method"""
     
     def __init__(self, trade_amount: float = 1.0):
+        load_api()
+        
         self.trade_amount = trade_amount
         self.ssid = os.getenv('SSID')
         self.client = None
         self.is_connected = False
+        self.is_demo = True
         
         # Working assets from your existing setup
         self.working_assets = [
@@ -38,6 +56,11 @@ class SimpleRealTrader:
             'AUDCAD', 'AUDCHF', 'AUDJPY', 'EURCHF', 'EURGBP', 'EURJPY', 'GBPJPY'
         ]
         
+        # API name and asset ID of each working asset, resolved once
+        self.asset_formats = {asset: self.get_asset_format(asset) for asset in self.working_assets}
+        self.asset_ids = {asset: ASSETS.get(api_asset, "Unknown") for asset, api_asset in self.asset_formats.items()}
+        self.tradable_assets = frozenset(asset for asset, api_asset in self.asset_formats.items() if api_asset in ASSETS)
+        
         print(f"💰 Simple Real Trader")
         print(f"   Trade Amount: ${self.trade_amount}")
         print(f"   SSID Available: {'✅' if self.ssid else '❌'}")
@@ -50,6 +73,22 @@ class SimpleRealTrader:
                 print("❌ SSID not found in .env file")
                 return False
             
+            # Reuse the live connection instead of repeating the websocket handshake
+            if self.client and self.is_demo == is_demo and self.client.is_connected:
+                self.is_connected = True
+                return True
+            
+            # Shut the old client down first; left running, its auto-reconnect
+            # and ping tasks would bring up a second session on the same SSID
+            if self.client:
+                try:
+                    await self.client.disconnect()
+                except Exception as e:
+                    print(f"⚠️ Error closing previous connection: {e}")
+                self.client = None
+                self.is_connected = False
+            
+            self.is_demo = is_demo
             print(f"🔌 Connecting to PocketOption ({'DEMO' if is_demo else 'REAL'})...")
             print(f"🔑 Using SSID: {self.ssid[:50]}...")
             
@@ -102,9 +141,7 @@ class SimpleRealTrader:
     def get_asset_format(self, asset: str) -> str:
         """Get correct asset format for API"""
         # Major pairs use direct format
-        major_pairs = {'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'USDCAD', 'AUDUSD'}
-        
-        if asset in major_pairs:
+        if asset in MAJOR_PAIRS:
             return asset
         else:
             # Cross pairs need _otc suffix
@@ -113,25 +150,35 @@ class SimpleRealTrader:
     async def place_real_call_trade(self, asset: str, duration_minutes: int = 1) -> Dict[str, Any]:
         """Place a real CALL trade"""
         
+        # Cheap liveness check on the reused client; reconnect only if it dropped
+        if self.is_connected and not self.client.is_connected:
+            print("🔄 Connection lost - reconnecting...")
+            self.is_connected = False
+            await self.connect(is_demo=self.is_demo)
+        
         if not self.is_connected:
             return {"success": False, "error": "Not connected"}
         
-        if asset not in self.working_assets:
+        # Hash lookups on the maps built in __init__ (working_assets is a list)
+        if asset not in self.asset_formats:
             return {"success": False, "error": f"Asset {asset} not in working assets"}
         
         # Get correct asset format
-        api_asset = self.get_asset_format(asset)
+        api_asset = self.asset_formats[asset]
         
-        if api_asset not in ASSETS:
+        if asset not in self.tradable_assets:
             return {"success": False, "error": f"Asset {api_asset} not found in API"}
         
         try:
-            print(f"\n🚀 PLACING REAL CALL TRADE")
-            print(f"   Asset: {asset} -> {api_asset}")
-            print(f"   Amount: ${self.trade_amount}")
-            print(f"   Direction: CALL")
-            print(f"   Duration: {duration_minutes} minute(s)")
-            print(f"   Time: {datetime.now().strftime('%H:%M:%S')}")
+            # Each report is printed with a single call
+            print('\n'.join([
+                f"\n🚀 PLACING REAL CALL TRADE",
+                f"   Asset: {asset} -> {api_asset}",
+                f"   Amount: ${self.trade_amount}",
+                f"   Direction: CALL",
+                f"   Duration: {duration_minutes} minute(s)",
+                f"   Time: {datetime.now().strftime('%H:%M:%S')}",
+            ]))
             
             # Place the order using the same method as app.py
             result = await self.client.place_order(
@@ -141,16 +188,21 @@ class SimpleRealTrader:
                 duration=duration_minutes * 60
             )
             
-            if result and hasattr(result, 'order_id'):
-                print(f"✅ TRADE PLACED SUCCESSFULLY!")
-                print(f"   Order ID: {result.order_id}")
-                print(f"   Asset: {asset} ({api_asset})")
-                print(f"   Amount: ${self.trade_amount}")
-                print(f"   Expected Return: ~${self.trade_amount * 0.8:.2f} if win")
+            # Single lookup; also covers a None result
+            order_id = getattr(result, 'order_id', None)
+            
+            if order_id is not None:
+                print('\n'.join([
+                    f"✅ TRADE PLACED SUCCESSFULLY!",
+                    f"   Order ID: {order_id}",
+                    f"   Asset: {asset} ({api_asset})",
+                    f"   Amount: ${self.trade_amount}",
+                    f"   Expected Return: ~${self.trade_amount * 0.8:.2f} if win",
+                ]))
                 
                 return {
                     "success": True,
-                    "order_id": result.order_id,
+                    "order_id": order_id,
                     "asset": asset,
                     "api_asset": api_asset,
                     "amount": self.trade_amount,
@@ -168,12 +220,21 @@ class SimpleRealTrader:
     
     def show_working_assets(self):
         """Show available working assets"""
-        print(f"\n📈 Working Assets ({len(self.working_assets)}):")
+        lines = [f"\n📈 Working Assets ({len(self.working_assets)}):"]
         
         for i, asset in enumerate(self.working_assets, 1):
-            api_asset = self.get_asset_format(asset)
-            asset_id = ASSETS.get(api_asset, "Unknown")
-            print(f"   {i:2d}. {asset:<8} -> {api_asset:<12} (ID: {asset_id})")
+            lines.append(f"   {i:2d}. {asset:<8} -> {self.asset_formats[asset]:<12} (ID: {self.asset_ids[asset]})")
+        
+        print('\n'.join(lines))
+
+# Prompts read stdin on their own worker thread rather than asyncio's default
+# executor, which asyncio.run waits for on exit; after Ctrl-C that thread is
+# still blocked in input() and the wait would last until Enter was pressed
+_PROMPT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prompt')
+
+async def ainput(prompt: str) -> str:
+    """input() on a worker thread so the event loop (and the websocket keep-alive) keeps running"""
+    return await asyncio.get_running_loop().run_in_executor(_PROMPT_EXECUTOR, input, prompt)
 
 async def demo_test():
     """Test connection in demo mode"""
@@ -210,7 +271,7 @@ async def real_trading_session():
     
     # Warning for real money
     print("⚠️ WARNING: This will use REAL MONEY!")
-    confirm = input("Type 'YES' to continue with real money trading: ")
+    confirm = await ainput("Type 'YES' to continue with real money trading: ")
     
     if confirm != 'YES':
         print("❌ Real trading cancelled")
@@ -233,17 +294,17 @@ async def real_trading_session():
             print("3. Quick EURUSD trade")
             print("4. Exit")
             
-            choice = input("\nSelect option (1-4): ").strip()
+            choice = (await ainput("\nSelect option (1-4): ")).strip()
             
             if choice == "1":
                 # Single trade
                 trader.show_working_assets()
                 
                 try:
-                    asset_num = int(input(f"\nSelect asset (1-{len(trader.working_assets)}): ")) - 1
+                    asset_num = int(await ainput(f"\nSelect asset (1-{len(trader.working_assets)}): ")) - 1
                     if 0 <= asset_num < len(trader.working_assets):
                         asset = trader.working_assets[asset_num]
-                        duration = int(input("Duration in minutes (1-5, default 1): ") or "1")
+                        duration = int(await ainput("Duration in minutes (1-5, default 1): ") or "1")
                         
                         # Final confirmation
                         print(f"\n📋 Trade Confirmation:")
@@ -252,7 +313,7 @@ async def real_trading_session():
                         print(f"   Direction: CALL")
                         print(f"   Duration: {duration} minute(s)")
                         
-                        final_confirm = input("Execute this REAL trade? Type 'YES': ")
+                        final_confirm = await ainput("Execute this REAL trade? Type 'YES': ")
                         
                         if final_confirm == 'YES':
                             result = await trader.place_real_call_trade(asset, duration)
@@ -276,7 +337,7 @@ async def real_trading_session():
             elif choice == "3":
                 # Quick EURUSD trade
                 print(f"\n🚀 Quick EURUSD CALL trade for ${trader.trade_amount}")
-                final_confirm = input("Execute REAL EURUSD trade? Type 'YES': ")
+                final_confirm = await ainput("Execute REAL EURUSD trade? Type 'YES': ")
                 
                 if final_confirm == 'YES':
                     result = await trader.place_real_call_trade("EURUSD", 1)
@@ -311,14 +372,20 @@ def main():
     print("1. Demo test (safe)")
     print("2. Real trading (uses real money)")
     
-    choice = input("Enter choice (1-2): ").strip()
-    
-    if choice == "1":
-        asyncio.run(demo_test())
-    elif choice == "2":
-        asyncio.run(real_trading_session())
-    else:
-        print("❌ Invalid choice")
+    try:
+        choice = input("Enter choice (1-2): ").strip()
+        if choice == "1":
+            run_main(demo_test())
+        elif choice == "2":
+            run_main(real_trading_session())
+        else:
+            print("❌ Invalid choice")
+    except KeyboardInterrupt:
+        # The session has already disconnected (Ctrl-C cancels it), but a
+        # prompt's worker thread may still be blocked in input(); exit without
+        # joining it
+        print("\n🛑 Stopped by user", flush=True)
+        os._exit(130)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
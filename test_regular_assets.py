@@ -1,55 +1,89 @@
 #!/usr/bin/env python3
 """
-Test all 21 regular format assets (non-OTC)
+Test all regular format assets (non-OTC)
 Quick verification that all major pairs work
+Requires Python 3.11+ (asyncio.timeout)
 """
 
 import os
+import sys
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 
+from async_runner import run_main
+
 from pocketoptionapi_async import AsyncPocketOptionClient
 from pocketoptionapi_async.models import OrderDirection
 
 load_dotenv()
 
-# All 21 regular format assets
-REGULAR_ASSETS = {
-    "AUDCAD": 58,
-    "AUDCHF": 59,
-    "AUDJPY": 60,
-    "AUDUSD": 61,
-    "CADCHF": 62,
-    "CADJPY": 63,
-    "CHFJPY": 64,
-    "EURAUD": 65,
-    "EURCAD": 66,
-    "EURCHF": 67,
-    "EURGBP": 68,
-    "EURJPY": 69,
-    "EURUSD": 70,
-    "GBPAUD": 71,
-    "GBPCAD": 72,
-    "GBPCHF": 73,
-    "GBPJPY": 74,
-    "GBPUSD": 75,
-    "USDCAD": 76,
-    "USDCHF": 77,
-    "USDJPY": 78,
-}
+# All regular format assets as (asset, asset ID) pairs; only ever iterated in order
+REGULAR_ASSETS = (
+    ("AUDCAD", 58),
+    ("AUDCHF", 59),
+    ("AUDJPY", 60),
+    ("AUDUSD", 61),
+    ("CADCHF", 62),
+    ("CADJPY", 63),
+    ("CHFJPY", 64),
+    ("EURAUD", 65),
+    ("EURCAD", 66),
+    ("EURCHF", 67),
+    ("EURGBP", 68),
+    ("EURJPY", 69),
+    ("EURUSD", 70),
+    ("GBPAUD", 71),
+    ("GBPCAD", 72),
+    ("GBPCHF", 73),
+    ("GBPJPY", 74),
+    ("GBPUSD", 75),
+    ("USDCAD", 76),
+    ("USDCHF", 77),
+    ("USDJPY", 78),
+)
+TOTAL_ASSETS = len(REGULAR_ASSETS)
+
+# Orders placed concurrently on the shared connection; halved on rate limit errors
+MAX_CONCURRENT_ORDERS = 5
+
+# Result statuses, interned so the filters can compare by identity
+SUCCESS = sys.intern("SUCCESS")
+TIMEOUT = sys.intern("TIMEOUT")
+NO_ORDER_ID = sys.intern("NO_ORDER_ID")
+ERROR = sys.intern("ERROR")
+
+# Error text that means the server is throttling us
+_RATE_LIMIT_MARKERS = ("rate limit", "too many")
+
+def iter_bits(mask):
+    """Yield the positions of the set bits in mask, lowest first"""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+def status_text(result):
+    """Status as shown in the reports, with the error message for errors"""
+    if result["status"] is ERROR:
+        return f"{ERROR}: {result['error_msg']}"
+    return result["status"]
 
 async def test_regular_assets():
-    """Test all 21 regular format assets"""
+    """Test all regular format assets"""
     
     ssid = os.getenv('SSID')
     if not ssid:
         print("❌ SSID not found")
         return
     
-    print("🧪 TESTING 21 REGULAR FORMAT ASSETS")
+    # One clock reading stamps the banner, the results file name and its header
+    test_time = datetime.now()
+    
+    print(f"🧪 TESTING {TOTAL_ASSETS} REGULAR FORMAT ASSETS")
     print("="*60)
-    print(f"   Test Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   Test Time: {test_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"   Mode: DEMO (safe testing)")
     print(f"   Trade Amount: $1.00")
     print(f"   Direction: CALL")
@@ -57,6 +91,8 @@ async def test_regular_assets():
     
     client = None
     results = []
+    # Bit i-1 is set once asset i has placed its order
+    success_mask = 0
     
     try:
         # Connect
@@ -70,71 +106,113 @@ async def test_regular_assets():
             enable_logging=False
         )
         
-        await asyncio.wait_for(client.connect(), timeout=15.0)
-        balance = await asyncio.wait_for(client.get_balance(), timeout=10.0)
+        # Connect and balance share one deadline
+        async with asyncio.timeout(25.0):
+            await client.connect()
+            balance = await client.get_balance()
         
         print(f"✅ Connected! Demo Balance: ${balance.balance:.2f}")
         
         # Test each asset
-        print(f"\n🚀 Testing {len(REGULAR_ASSETS)} assets...")
+        print(f"\n🚀 Testing {TOTAL_ASSETS} assets...")
         print("="*60)
         
-        for i, (asset, asset_id) in enumerate(REGULAR_ASSETS.items(), 1):
-            print(f"\n[{i}/21] Testing {asset} (ID: {asset_id})...")
-            
+        # Up to max_in_flight orders are in flight at once on the one
+        # connection, so the run takes a few round trips instead of one per asset.
+        # An explicit counter under a condition lets the cap be lowered
+        # while orders are running, which a Semaphore cannot do safely.
+        slot_free = asyncio.Condition()
+        in_flight = 0
+        max_in_flight = MAX_CONCURRENT_ORDERS
+        
+        @asynccontextmanager
+        async def order_slot():
+            nonlocal in_flight
+            async with slot_free:
+                while in_flight >= max_in_flight:
+                    await slot_free.wait()
+                in_flight += 1
             try:
-                result = await asyncio.wait_for(
-                    client.place_order(
-                        asset=asset,
-                        amount=1.0,
-                        direction=OrderDirection.CALL,
-                        duration=60
-                    ),
-                    timeout=8.0
-                )
+                yield
+            finally:
+                async with slot_free:
+                    in_flight -= 1
+                    slot_free.notify(1)
+        
+        async def test_asset(i, asset, asset_id):
+            nonlocal max_in_flight, success_mask
+            async with order_slot():
+                print(f"\n[{i}/{TOTAL_ASSETS}] Testing {asset} (ID: {asset_id})...")
                 
-                if result and hasattr(result, 'order_id'):
-                    print(f"   ✅ SUCCESS - Order ID: {result.order_id}")
-                    results.append({
+                try:
+                    async with asyncio.timeout(8.0):
+                        result = await client.place_order(
+                            asset=asset,
+                            amount=1.0,
+                            direction=OrderDirection.CALL,
+                            duration=60
+                        )
+                    
+                    order_id = getattr(result, 'order_id', None) if result else None
+                    if order_id is not None:
+                        print(f"   ✅ {asset} SUCCESS - Order ID: {order_id}")
+                        success_mask |= 1 << (i - 1)
+                        outcome = {
+                            "asset": asset,
+                            "asset_id": asset_id,
+                            "status": SUCCESS,
+                            "order_id": order_id
+                        }
+                    else:
+                        print(f"   ❌ {asset} FAILED - No order ID")
+                        outcome = {
+                            "asset": asset,
+                            "asset_id": asset_id,
+                            "status": NO_ORDER_ID,
+                            "order_id": None
+                        }
+                        
+                except asyncio.TimeoutError:
+                    print(f"   ⏱️ {asset} TIMEOUT")
+                    outcome = {
                         "asset": asset,
                         "asset_id": asset_id,
-                        "status": "SUCCESS",
-                        "order_id": result.order_id
-                    })
-                else:
-                    print(f"   ❌ FAILED - No order ID")
-                    results.append({
+                        "status": TIMEOUT,
+                        "order_id": None
+                    }
+                except Exception as e:
+                    print(f"   ❌ {asset} ERROR - {str(e)}")
+                    if max_in_flight > 1 and any(m in str(e).lower() for m in _RATE_LIMIT_MARKERS):
+                        # Lowering the cap needs no notify; waiters recheck it on release
+                        max_in_flight = max(1, max_in_flight // 2)
+                        print(f"   🐢 Rate limited - in-flight cap lowered to {max_in_flight}")
+                    outcome = {
                         "asset": asset,
                         "asset_id": asset_id,
-                        "status": "NO_ORDER_ID",
-                        "order_id": None
-                    })
-                    
-            except asyncio.TimeoutError:
-                print(f"   ⏱️ TIMEOUT")
-                results.append({
-                    "asset": asset,
-                    "asset_id": asset_id,
-                    "status": "TIMEOUT",
-                    "order_id": None
-                })
-            except Exception as e:
-                print(f"   ❌ ERROR - {str(e)}")
-                results.append({
-                    "asset": asset,
-                    "asset_id": asset_id,
-                    "status": f"ERROR: {str(e)}",
-                    "order_id": None
-                })
+                        "status": ERROR,
+                        "order_id": None,
+                        "error_msg": str(e)
+                    }
             
-            # Small delay between trades
-            if i < len(REGULAR_ASSETS):
-                await asyncio.sleep(0.5)
+            return outcome
+        
+        tasks = [
+            asyncio.create_task(test_asset(i, asset, asset_id))
+            for i, (asset, asset_id) in enumerate(REGULAR_ASSETS, 1)
+        ]
+        
+        # Running counts as orders finish, in whatever order they finish
+        completed = 0
+        for next_done in asyncio.as_completed(tasks):
+            await next_done
+            completed += 1
             
             # Progress update every 5 assets
-            if i % 5 == 0:
-                successful = len([r for r in results if r["status"] == "SUCCESS"])
-                print(f"\n   📊 Progress: {i}/21 ({(successful/i)*100:.1f}% success)")
+            if completed % 5 == 0:
+                print(f"\n   📊 Progress: {completed}/{TOTAL_ASSETS} ({(success_mask.bit_count()/completed)*100:.1f}% success)")
+        
+        # Report in asset order regardless of completion order
+        results = [task.result() for task in tasks]
     
     finally:
         if client:
@@ -146,54 +224,59 @@ async def test_regular_assets():
     print("📊 FINAL RESULTS")
     print("="*60)
     
-    successful = [r for r in results if r["status"] == "SUCCESS"]
-    failed = [r for r in results if r["status"] != "SUCCESS"]
+    # Split the results by the success bits; the report and the file both reuse the split
+    successful = [results[i] for i in iter_bits(success_mask)]
+    failed = [results[i] for i in iter_bits(((1 << len(results)) - 1) ^ success_mask)]
     
-    print(f"\n✅ SUCCESSFUL: {len(successful)}/21 ({(len(successful)/21)*100:.1f}%)")
+    print(f"\n✅ SUCCESSFUL: {len(successful)}/{TOTAL_ASSETS} ({(len(successful)/TOTAL_ASSETS)*100:.1f}%)")
     for result in successful:
         print(f"   • {result['asset']:<8} (ID: {result['asset_id']}) - {result['order_id']}")
     
     if failed:
-        print(f"\n❌ FAILED: {len(failed)}/21 ({(len(failed)/21)*100:.1f}%)")
+        print(f"\n❌ FAILED: {len(failed)}/{TOTAL_ASSETS} ({(len(failed)/TOTAL_ASSETS)*100:.1f}%)")
         for result in failed:
-            print(f"   • {result['asset']:<8} (ID: {result['asset_id']}) - {result['status']}")
+            print(f"   • {result['asset']:<8} (ID: {result['asset_id']}) - {status_text(result)}")
     
     # Summary
     print(f"\n" + "="*60)
     print("🎯 SUMMARY")
     print("="*60)
-    print(f"   Total Assets Tested: 21")
+    print(f"   Total Assets Tested: {TOTAL_ASSETS}")
     print(f"   ✅ Working: {len(successful)}")
     print(f"   ❌ Not Working: {len(failed)}")
-    print(f"   Success Rate: {(len(successful)/21)*100:.1f}%")
+    print(f"   Success Rate: {(len(successful)/TOTAL_ASSETS)*100:.1f}%")
     
-    if len(successful) == 21:
-        print(f"\n🎉 PERFECT! All 21 regular format assets are working!")
-    elif len(successful) >= 18:
-        print(f"\n✅ EXCELLENT! {len(successful)}/21 assets working!")
+    if len(successful) == TOTAL_ASSETS:
+        print(f"\n🎉 PERFECT! All {TOTAL_ASSETS} regular format assets are working!")
+    elif len(successful) >= TOTAL_ASSETS - 3:
+        print(f"\n✅ EXCELLENT! {len(successful)}/{TOTAL_ASSETS} assets working!")
     else:
         print(f"\n⚠️ Some assets need attention")
     
     # Save results
     print(f"\n💾 Saving results...")
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = test_time.strftime('%Y%m%d_%H%M%S')
     filename = f"regular_assets_test_{timestamp}.txt"
     
-    with open(filename, 'w') as f:
-        f.write(f"Regular Format Assets Test Results\n")
-        f.write(f"Test Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"="*60 + "\n\n")
-        
-        f.write(f"SUCCESSFUL ASSETS ({len(successful)}/21):\n")
-        for result in successful:
-            f.write(f"  {result['asset']:<8} ID: {result['asset_id']}\n")
-        
-        if failed:
-            f.write(f"\nFAILED ASSETS ({len(failed)}/21):\n")
-            for result in failed:
-                f.write(f"  {result['asset']:<8} ID: {result['asset_id']} - {result['status']}\n")
-        
-        f.write(f"\nSuccess Rate: {(len(successful)/21)*100:.1f}%\n")
+    # Render the whole report first so the file gets a single write
+    report = [
+        f"Regular Format Assets Test Results\n",
+        f"Test Date: {test_time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"="*60 + "\n\n",
+        f"SUCCESSFUL ASSETS ({len(successful)}/{TOTAL_ASSETS}):\n",
+    ]
+    for result in successful:
+        report.append(f"  {result['asset']:<8} ID: {result['asset_id']}\n")
+    
+    if failed:
+        report.append(f"\nFAILED ASSETS ({len(failed)}/{TOTAL_ASSETS}):\n")
+        for result in failed:
+            report.append(f"  {result['asset']:<8} ID: {result['asset_id']} - {status_text(result)}\n")
+    
+    report.append(f"\nSuccess Rate: {(len(successful)/TOTAL_ASSETS)*100:.1f}%\n")
+    
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(''.join(report))
     
     print(f"✅ Results saved to: {filename}")
     
@@ -204,4 +287,4 @@ async def main():
     await test_regular_assets()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_main(main())
\ No newline at end of file
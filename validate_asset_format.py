@@ -3,65 +3,76 @@
 Validate and fix asset format for PocketOption API compatibility
 """
 
-import re
-from pocketoptionapi_async.constants import ASSETS
-
+import sys
+from functools import lru_cache
+
+# Spaces and slashes are dropped in one translate pass (EUR/USD OTC -> EURUSDOTC)
+_STRIP_SEPARATORS = str.maketrans('', '', ' /')
+
+# Where generate_corrected_constants writes by default
+CORRECTED_CONSTANTS_FILE = 'pocketoptionapi_async/constants_corrected.py'
+
+# Original extracted assets from HTML
+HTML_ASSETS = (
+    "AED/CNY OTC", "AUD/CAD OTC", "AUD/CHF OTC", "AUD/JPY OTC", "AUD/NZD OTC",
+    "AUD/USD OTC", "BHD/CNY OTC", "CAD/CHF OTC", "CAD/JPY OTC", "CHF/JPY OTC",
+    "CHF/NOK OTC", "EUR/CHF OTC", "EUR/GBP OTC", "EUR/HUF OTC", "EUR/JPY OTC",
+    "EUR/NZD OTC", "EUR/TRY OTC", "EUR/USD OTC", "GBP/AUD OTC", "GBP/JPY OTC",
+    "GBP/USD OTC", "JOD/CNY OTC", "KES/USD OTC", "LBP/USD OTC", "MAD/USD OTC",
+    "NGN/USD OTC", "NZD/JPY OTC", "NZD/USD OTC", "OMR/CNY OTC", "QAR/CNY OTC",
+    "SAR/CNY OTC", "TND/USD OTC", "UAH/USD OTC", "USD/ARS OTC", "USD/BDT OTC",
+    "USD/BRL OTC", "USD/CAD OTC", "USD/CHF OTC", "USD/CLP OTC", "USD/CNH OTC",
+    "USD/COP OTC", "USD/DZD OTC", "USD/EGP OTC", "USD/IDR OTC", "USD/INR OTC",
+    "USD/JPY OTC", "USD/MXN OTC", "USD/MYR OTC", "USD/PHP OTC", "USD/PKR OTC",
+    "USD/RUB OTC", "USD/SGD OTC", "USD/THB OTC", "ZAR/USD OTC", "EUR/RUB OTC",
+    "USD/VND OTC", "YER/USD OTC",
+    "AUD/CAD", "AUD/CHF", "AUD/JPY", "AUD/USD", "CAD/CHF", "CAD/JPY",
+    "CHF/JPY", "EUR/AUD", "EUR/CAD", "EUR/CHF", "EUR/GBP", "EUR/JPY",
+    "EUR/USD", "GBP/AUD", "GBP/CAD", "GBP/CHF", "GBP/JPY", "GBP/USD",
+    "USD/CAD", "USD/CHF", "USD/JPY"
+)
+
+@lru_cache(maxsize=256)
 def convert_html_to_api_format(asset_name):
     """Convert HTML asset name to PocketOption API format"""
     if not asset_name:
         return None
     
-    # Remove spaces and convert to uppercase
-    asset = asset_name.upper().replace(" ", "")
+    # Remove spaces and slashes, then convert to uppercase
+    asset = asset_name.translate(_STRIP_SEPARATORS).upper()
     
-    # Handle OTC assets
+    # Handle OTC assets: replace the OTC marker with an _otc suffix
     if asset.endswith("OTC"):
-        # Remove OTC and add _otc suffix
-        base_asset = asset[:-3]  # Remove "OTC"
-        # Convert slashes to nothing (EUR/USD -> EURUSD)
-        base_asset = base_asset.replace("/", "")
-        return f"{base_asset}_otc"
-    else:
-        # Regular assets - just remove slashes
-        return asset.replace("/", "")
-
-def validate_assets():
-    """Validate current assets and show correct format"""
+        return f"{asset[:-3]}_otc"
+    
+    # Regular assets
+    return asset
+
+def convert_all_assets():
+    """Convert every HTML asset to API format, mapped to its position as ID"""
+    # A later duplicate replaces the earlier ID, as the report points out
+    return {convert_html_to_api_format(html_asset): i for i, html_asset in enumerate(HTML_ASSETS, 1)}
+
+def validate_assets(converted_assets):
+    """Show the conversion of each asset and flag formats worth checking"""
     print("=" * 80)
     print("🔍 VALIDATING ASSET FORMATS")
     print("=" * 80)
     
-    # Original extracted assets from HTML
-    html_assets = [
-        "AED/CNY OTC", "AUD/CAD OTC", "AUD/CHF OTC", "AUD/JPY OTC", "AUD/NZD OTC",
-        "AUD/USD OTC", "BHD/CNY OTC", "CAD/CHF OTC", "CAD/JPY OTC", "CHF/JPY OTC",
-        "CHF/NOK OTC", "EUR/CHF OTC", "EUR/GBP OTC", "EUR/HUF OTC", "EUR/JPY OTC",
-        "EUR/NZD OTC", "EUR/TRY OTC", "EUR/USD OTC", "GBP/AUD OTC", "GBP/JPY OTC",
-        "GBP/USD OTC", "JOD/CNY OTC", "KES/USD OTC", "LBP/USD OTC", "MAD/USD OTC",
-        "NGN/USD OTC", "NZD/JPY OTC", "NZD/USD OTC", "OMR/CNY OTC", "QAR/CNY OTC",
-        "SAR/CNY OTC", "TND/USD OTC", "UAH/USD OTC", "USD/ARS OTC", "USD/BDT OTC",
-        "USD/BRL OTC", "USD/CAD OTC", "USD/CHF OTC", "USD/CLP OTC", "USD/CNH OTC",
-        "USD/COP OTC", "USD/DZD OTC", "USD/EGP OTC", "USD/IDR OTC", "USD/INR OTC",
-        "USD/JPY OTC", "USD/MXN OTC", "USD/MYR OTC", "USD/PHP OTC", "USD/PKR OTC",
-        "USD/RUB OTC", "USD/SGD OTC", "USD/THB OTC", "ZAR/USD OTC", "EUR/RUB OTC",
-        "USD/VND OTC", "YER/USD OTC",
-        "AUD/CAD", "AUD/CHF", "AUD/JPY", "AUD/USD", "CAD/CHF", "CAD/JPY",
-        "CHF/JPY", "EUR/AUD", "EUR/CAD", "EUR/CHF", "EUR/GBP", "EUR/JPY",
-        "EUR/USD", "GBP/AUD", "GBP/CAD", "GBP/CHF", "GBP/JPY", "GBP/USD",
-        "USD/CAD", "USD/CHF", "USD/JPY"
-    ]
-    
-    print(f"📊 Total assets to convert: {len(html_assets)}")
+    print(f"📊 Total assets to convert: {len(HTML_ASSETS)}")
     print("\n" + "=" * 80)
     print("🔄 CONVERSION RESULTS")
     print("=" * 80)
     
-    converted_assets = {}
+    seen = {}
+    lines = []
     major_pairs = {'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'USDCAD', 'AUDUSD', 'NZDUSD'}
     
-    for i, html_asset in enumerate(html_assets, 1):
+    for i, html_asset in enumerate(HTML_ASSETS, 1):
         api_format = convert_html_to_api_format(html_asset)
-        converted_assets[api_format] = i
+        if api_format in seen:
+            lines.append(f"⚠️ {html_asset} duplicates {api_format} (ID {seen[api_format]} replaced by {i})")
+        seen[api_format] = i
         
         # Check if it's a major pair that shouldn't have _otc
         if api_format and api_format.endswith('_otc'):
@@ -75,19 +86,19 @@ def validate_assets():
         else:
             status = "✅ Regular format"
         
-        print(f"{i:2d}. {html_asset:<20} -> {api_format:<15} {status}")
+        lines.append(f"{i:2d}. {html_asset:<20} -> {api_format:<15} {status}")
     
-    return converted_assets
+    # One write for the whole table
+    print('\n'.join(lines))
 
-def generate_corrected_constants():
+def generate_corrected_constants(converted_assets, path=CORRECTED_CONSTANTS_FILE):
     """Generate corrected constants.py content"""
-    converted_assets = validate_assets()
-    
     print("\n" + "=" * 80)
     print("📝 GENERATING CORRECTED CONSTANTS.PY")
     print("=" * 80)
     
-    constants_content = '''"""
+    # Collect the file in pieces and join once at the end
+    parts = ['''"""
 Constants and configuration for the PocketOption API
 """
 
@@ -96,22 +107,26 @@ import random
 
 # Asset mappings with their corresponding IDs - Corrected API format
 ASSETS: Dict[str, int] = {
-'''
+''']
     
-    # Sort assets by type
-    otc_assets = {k: v for k, v in converted_assets.items() if k.endswith('_otc')}
-    regular_assets = {k: v for k, v in converted_assets.items() if not k.endswith('_otc')}
+    # Sort assets by type (one pass to split, then sort each list in place)
+    otc_assets = []
+    regular_assets = []
+    for asset, asset_id in converted_assets.items():
+        (otc_assets if asset.endswith('_otc') else regular_assets).append((asset, asset_id))
+    otc_assets.sort()
+    regular_assets.sort()
     
     # Add OTC assets
-    constants_content += "    # OTC Currency Pairs\n"
-    for asset, asset_id in sorted(otc_assets.items()):
-        constants_content += f'    "{asset}": {asset_id},\n'
+    parts.append("    # OTC Currency Pairs\n")
+    for asset, asset_id in otc_assets:
+        parts.append(f'    "{asset}": {asset_id},\n')
     
-    constants_content += "\n    # Regular Currency Pairs (Non-OTC)\n"
-    for asset, asset_id in sorted(regular_assets.items()):
-        constants_content += f'    "{asset}": {asset_id},\n'
+    parts.append("\n    # Regular Currency Pairs (Non-OTC)\n")
+    for asset, asset_id in regular_assets:
+        parts.append(f'    "{asset}": {asset_id},\n')
     
-    constants_content += '''}
+    parts.append('''}
 
 
 # WebSocket regions with their URLs
@@ -205,20 +220,23 @@ API_LIMITS = {
 DEFAULT_HEADERS = {
     "Origin": "https://pocketoption.com",
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
-}'''
+}''')
     
     # Save corrected constants
-    with open('pocketoptionapi_async/constants_corrected.py', 'w', encoding='utf-8') as f:
-        f.write(constants_content)
-    
-    print("✅ Generated corrected constants file: pocketoptionapi_async/constants_corrected.py")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
     
-    return converted_assets
+    print(f"✅ Generated corrected constants file: {path}")
 
 def main():
     """Main function"""
     print("🚀 Starting asset format validation...")
-    converted_assets = generate_corrected_constants()
+    converted_assets = convert_all_assets()
+    
+    # The per-asset table is only printed on request
+    if '--verbose' in sys.argv:
+        validate_assets(converted_assets)
+    generate_corrected_constants(converted_assets)
     
     print("\n" + "=" * 80)
     print("📋 SUMMARY")
@@ -229,6 +247,8 @@ def main():
     print("1. Review the corrected format in constants_corrected.py")
     print("2. Replace the original constants.py if format looks correct")
     print("3. Test with PocketOption API")
+    if '--verbose' not in sys.argv:
+        print("\n💡 Run with --verbose to see the per-asset conversion table")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file